@@ -3,6 +3,7 @@ Cloud Object Storage Configuration
 This file contains configuration settings for COS event handling
 """
 
+import functools
 import os
 
 # COS Configuration
@@ -58,6 +59,7 @@ def is_cos_configured():
     config = get_cos_config()
     return bool(config['endpoint'] and config['bucket_name'])
 
+@functools.lru_cache(maxsize=None)
 def get_webhook_url(base_url):
-    """Get the full webhook URL"""
+    """Get the full webhook URL (memoized - the URL never changes)"""
     return f"{base_url.rstrip('/')}{WEBHOOK_CONFIG['endpoint']}" 
\ No newline at end of file
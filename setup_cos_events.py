@@ -6,22 +6,35 @@ This script helps configure COS event notifications for your application
 
 import os
 import sys
-import json
+import orjson
 import requests
+from requests.adapters import HTTPAdapter, Retry
 from cos_config import get_cos_config, get_webhook_url, COS_EVENT_TYPES
 
+# Shared session: one pooled keep-alive connection instead of a fresh
+# TCP handshake per request
+_SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16,
+                       max_retries=Retry(total=2, backoff_factor=0.1))
+_SESSION.mount('http://', _adapter)
+_SESSION.mount('https://', _adapter)
+
 def print_banner():
     """Print setup banner"""
-    print("=" * 60)
-    print("Cloud Object Storage Event Listener Setup")
-    print("=" * 60)
-    print()
+    # One write() for the whole banner instead of a syscall per line
+    sys.stdout.write("\n".join([
+        "=" * 60,
+        "Cloud Object Storage Event Listener Setup",
+        "=" * 60,
+        "",
+    ]) + "\n")
 
-def check_environment():
+def check_environment(config=None):
     """Check if required environment variables are set"""
     print("Checking environment configuration...")
-    
-    config = get_cos_config()
+
+    if config is None:
+        config = get_cos_config()
     missing_vars = []
     
     required_vars = ['COS_ENDPOINT', 'COS_BUCKET_NAME']
@@ -54,41 +67,42 @@ def get_webhook_endpoint():
     
     return webhook_url
 
-def generate_cos_config():
+def generate_cos_config(cos_config=None, webhook_url=None):
     """Generate COS configuration for event notifications"""
     print("\nCOS Event Notification Configuration:")
-    
+
     config = {
         "event_types": COS_EVENT_TYPES,
-        "webhook_url": get_webhook_endpoint(),
-        "cos_config": get_cos_config()
+        "webhook_url": webhook_url or get_webhook_endpoint(),
+        "cos_config": cos_config if cos_config is not None else get_cos_config()
     }
-    
+
     print("Event types to listen for:")
     for event_type in COS_EVENT_TYPES:
         print(f"  - {event_type}")
-    
+
     return config
 
-def create_notification_config():
+def create_notification_config(cos_config=None, webhook_url=None):
     """Create notification configuration file"""
-    config = generate_cos_config()
+    config = generate_cos_config(cos_config, webhook_url)
     
     config_file = "cos_notification_config.json"
-    with open(config_file, 'w') as f:
-        json.dump(config, f, indent=2)
+    with open(config_file, 'wb') as f:
+        f.write(orjson.dumps(config, option=orjson.OPT_INDENT_2))
     
     print(f"\n✅ Configuration saved to: {config_file}")
     return config_file
 
-def test_webhook_endpoint():
+def test_webhook_endpoint(webhook_url=None):
     """Test if the webhook endpoint is accessible"""
     print("\nTesting webhook endpoint...")
-    
-    webhook_url = get_webhook_endpoint()
-    
+
+    if webhook_url is None:
+        webhook_url = get_webhook_endpoint()
+
     try:
-        response = requests.get(webhook_url, timeout=10)
+        response = _SESSION.get(webhook_url, timeout=10)
         if response.status_code == 200:
             print("✅ Webhook endpoint is accessible")
             return True
@@ -100,51 +114,63 @@ def test_webhook_endpoint():
         print("Make sure your application is running and accessible")
         return False
 
-def print_setup_instructions():
+def print_setup_instructions(webhook_url=None):
     """Print setup instructions for COS event notifications"""
-    print("\n" + "=" * 60)
-    print("SETUP INSTRUCTIONS")
-    print("=" * 60)
-    
-    print("\n1. IBM Cloud Object Storage Setup:")
-    print("   - Go to your IBM Cloud COS instance")
-    print("   - Navigate to your bucket")
-    print("   - Go to 'Configuration' > 'Event Notifications'")
-    print("   - Click 'Create notification'")
-    
-    print("\n2. Configure the notification:")
-    print("   - Name: cos-event-listener")
-    print("   - Event types: Select the events you want to listen for")
-    print("   - Destination: Webhook")
-    print(f"   - URL: {get_webhook_endpoint()}")
-    print("   - HTTP method: POST")
-    
-    print("\n3. Optional: Configure authentication:")
-    print("   - If you want to verify webhook signatures:")
-    print("   - Set a secret key in COS notification settings")
-    print("   - Set the same key as COS_SECRET_KEY environment variable")
-    
-    print("\n4. Test the setup:")
-    print("   - Upload a file to your COS bucket")
-    print("   - Check your application logs for the event")
-    print("   - Or use: curl -X GET <your-app-url>/cos/events")
+    if webhook_url is None:
+        webhook_url = get_webhook_endpoint()
+    # Build the whole instruction block and emit it with a single write()
+    sys.stdout.write("\n".join([
+        "",
+        "=" * 60,
+        "SETUP INSTRUCTIONS",
+        "=" * 60,
+        "",
+        "1. IBM Cloud Object Storage Setup:",
+        "   - Go to your IBM Cloud COS instance",
+        "   - Navigate to your bucket",
+        "   - Go to 'Configuration' > 'Event Notifications'",
+        "   - Click 'Create notification'",
+        "",
+        "2. Configure the notification:",
+        "   - Name: cos-event-listener",
+        "   - Event types: Select the events you want to listen for",
+        "   - Destination: Webhook",
+        f"   - URL: {webhook_url}",
+        "   - HTTP method: POST",
+        "",
+        "3. Optional: Configure authentication:",
+        "   - If you want to verify webhook signatures:",
+        "   - Set a secret key in COS notification settings",
+        "   - Set the same key as COS_SECRET_KEY environment variable",
+        "",
+        "4. Test the setup:",
+        "   - Upload a file to your COS bucket",
+        "   - Check your application logs for the event",
+        "   - Or use: curl -X GET <your-app-url>/cos/events",
+    ]) + "\n")
 
 def main():
     """Main setup function"""
     print_banner()
-    
+
+    # Read the environment once and thread the results through the
+    # setup steps instead of re-resolving them per function
+    cos_config = get_cos_config()
+
     # Check environment
-    if not check_environment():
+    if not check_environment(cos_config):
         sys.exit(1)
-    
+
+    webhook_url = get_webhook_endpoint()
+
     # Generate configuration
-    config_file = create_notification_config()
-    
+    config_file = create_notification_config(cos_config, webhook_url)
+
     # Test webhook endpoint
-    test_webhook_endpoint()
-    
+    test_webhook_endpoint(webhook_url)
+
     # Print instructions
-    print_setup_instructions()
+    print_setup_instructions(webhook_url)
     
     print(f"\n✅ Setup complete! Configuration saved to: {config_file}")
     print("\nNext steps:")
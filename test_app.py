@@ -1,161 +1,219 @@
+import atexit
+import logging
 import requests
+from requests.adapters import HTTPAdapter
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+# Logging instead of print: handlers are thread-safe, so output from
+# concurrently running tests is emitted a whole record at a time
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+# orjson parses/serializes JSON several times faster than stdlib json;
+# fall back gracefully when it is not installed
+try:
+    import orjson
+    def _dumps(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    _loads = orjson.loads
+    _dumpb = orjson.dumps
+except ImportError:
+    def _dumps(obj):
+        return json.dumps(obj, indent=2)
+    _loads = json.loads
+    def _dumpb(obj):
+        return json.dumps(obj).encode()
 
 # Base URL for the application
 BASE_URL = "http://localhost:5000"
 
+# Endpoint URLs assembled once instead of an f-string per request
+_URL_ROOT = f"{BASE_URL}/"
+_URL_COS_EVENTS = f"{BASE_URL}/cos/events"
+_URL_DATA = f"{BASE_URL}/api/data"
+_URL_HEALTH = f"{BASE_URL}/health"
+
+# One keep-alive connection for the whole run instead of a TCP
+# handshake per request
+SESSION = requests.Session()
+# Pool sized to the fan-out concurrency; pool_block keeps a burst of
+# workers waiting for a pooled connection instead of opening and
+# discarding extras
+SESSION.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=8,
+                                     pool_block=True, max_retries=0))
+atexit.register(SESSION.close)
+
+# Shared header dict + orjson-encoded bodies bypass requests' stdlib
+# json serialization on every POST
+_JSON_HDR = {'Content-Type': 'application/json'}
+
+# The sample bodies are fixed, so serialize them once at import time;
+# each POST then ships prebuilt bytes with no per-call dict build or
+# JSON encode
+_SAMPLE_COS_EVENT = _dumpb({
+    "events": [
+        {
+            "eventType": "Object:Put",
+            "bucket": "test-bucket",
+            "key": "uploads/test-file.txt",
+            "time": "2024-01-15T10:30:00.000Z"
+        }
+    ]
+})
+
+_SAMPLE_S3_EVENT = _dumpb({
+    "Records": [
+        {
+            "eventName": "ObjectCreated:Put",
+            "eventTime": "2024-01-15T10:30:00.000Z",
+            "s3": {
+                "bucket": {
+                    "name": "test-bucket"
+                },
+                "object": {
+                    "key": "uploads/test-file.txt"
+                }
+            }
+        }
+    ]
+})
+
+_SAMPLE_DELETE_EVENT = _dumpb({
+    "events": [
+        {
+            "eventType": "Object:Delete",
+            "bucket": "test-bucket",
+            "key": "uploads/deleted-file.txt",
+            "time": "2024-01-15T10:35:00.000Z"
+        }
+    ]
+})
+
 def test_home_endpoint():
     """Test the home endpoint with different query parameters"""
-    print("=== Testing Home Endpoint ===")
+    logger.info("=== Testing Home Endpoint ===")
     
     # Test without parameters
-    response = requests.get(f"{BASE_URL}/")
-    print(f"GET {BASE_URL}/")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    response = SESSION.get(_URL_ROOT)
+    logger.info(f"GET {_URL_ROOT}")
+    logger.info(f"Status: {response.status_code}")
+    logger.info(f"Response: {_dumps(_loads(response.content))}")
+    logger.info("")
     
     # Test with name parameter
-    response = requests.get(f"{BASE_URL}/?name=Alice")
-    print(f"GET {BASE_URL}/?name=Alice")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    response = SESSION.get(_URL_ROOT, params={'name': 'Alice'})
+    logger.info(f"GET {_URL_ROOT}?name=Alice")
+    logger.info(f"Status: {response.status_code}")
+    logger.info(f"Response: {_dumps(_loads(response.content))}")
+    logger.info("")
     
     # Test with multiple parameters
-    response = requests.get(f"{BASE_URL}/?name=Bob&age=30&city=NewYork")
-    print(f"GET {BASE_URL}/?name=Bob&age=30&city=NewYork")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    response = SESSION.get(_URL_ROOT, params={'name': 'Bob', 'age': 30, 'city': 'NewYork'})
+    logger.info(f"GET {_URL_ROOT}?name=Bob&age=30&city=NewYork")
+    logger.info(f"Status: {response.status_code}")
+    logger.info(f"Response: {_dumps(_loads(response.content))}")
+    logger.info("")
 
 def test_cos_events_endpoint():
     """Test the COS events endpoint"""
-    print("=== Testing COS Events Endpoint ===")
+    logger.info("=== Testing COS Events Endpoint ===")
     
     # Test GET request (status check)
-    response = requests.get(f"{BASE_URL}/cos/events")
-    print(f"GET {BASE_URL}/cos/events")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    response = SESSION.get(_URL_COS_EVENTS)
+    logger.info(f"GET {_URL_COS_EVENTS}")
+    logger.info(f"Status: {response.status_code}")
+    logger.info(f"Response: {_dumps(_loads(response.content))}")
+    logger.info("")
     
     # Test POST request with sample COS event
-    sample_cos_event = {
-        "events": [
-            {
-                "eventType": "Object:Put",
-                "bucket": "test-bucket",
-                "key": "uploads/test-file.txt",
-                "time": "2024-01-15T10:30:00.000Z"
-            }
-        ]
-    }
-    
-    response = requests.post(f"{BASE_URL}/cos/events", json=sample_cos_event)
-    print(f"POST {BASE_URL}/cos/events")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    response = SESSION.post(_URL_COS_EVENTS, data=_SAMPLE_COS_EVENT, headers=_JSON_HDR)
+    logger.info(f"POST {_URL_COS_EVENTS}")
+    logger.info(f"Status: {response.status_code}")
+    logger.info(f"Response: {_dumps(_loads(response.content))}")
+    logger.info("")
     
     # Test POST request with S3-compatible format
-    sample_s3_event = {
-        "Records": [
-            {
-                "eventName": "ObjectCreated:Put",
-                "eventTime": "2024-01-15T10:30:00.000Z",
-                "s3": {
-                    "bucket": {
-                        "name": "test-bucket"
-                    },
-                    "object": {
-                        "key": "uploads/test-file.txt"
-                    }
-                }
-            }
-        ]
-    }
-    
-    response = requests.post(f"{BASE_URL}/cos/events", json=sample_s3_event)
-    print(f"POST {BASE_URL}/cos/events (S3 format)")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    response = SESSION.post(_URL_COS_EVENTS, data=_SAMPLE_S3_EVENT, headers=_JSON_HDR)
+    logger.info(f"POST {_URL_COS_EVENTS} (S3 format)")
+    logger.info(f"Status: {response.status_code}")
+    logger.info(f"Response: {_dumps(_loads(response.content))}")
+    logger.info("")
 
 def test_data_endpoint():
     """Test the data endpoint with different query parameters"""
-    print("=== Testing Data Endpoint ===")
+    logger.info("=== Testing Data Endpoint ===")
     
     # Test without parameters
-    response = requests.get(f"{BASE_URL}/api/data")
-    print(f"GET {BASE_URL}/api/data")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    response = SESSION.get(_URL_DATA)
+    logger.info(f"GET {_URL_DATA}")
+    logger.info(f"Status: {response.status_code}")
+    logger.info(f"Response: {_dumps(_loads(response.content))}")
+    logger.info("")
     
     # Test with pagination
-    response = requests.get(f"{BASE_URL}/api/data?limit=2&offset=1")
-    print(f"GET {BASE_URL}/api/data?limit=2&offset=1")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    response = SESSION.get(_URL_DATA, params={'limit': 2, 'offset': 1})
+    logger.info(f"GET {_URL_DATA}?limit=2&offset=1")
+    logger.info(f"Status: {response.status_code}")
+    logger.info(f"Response: {_dumps(_loads(response.content))}")
+    logger.info("")
     
     # Test with category filter
-    response = requests.get(f"{BASE_URL}/api/data?category=tech")
-    print(f"GET {BASE_URL}/api/data?category=tech")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    response = SESSION.get(_URL_DATA, params={'category': 'tech'})
+    logger.info(f"GET {_URL_DATA}?category=tech")
+    logger.info(f"Status: {response.status_code}")
+    logger.info(f"Response: {_dumps(_loads(response.content))}")
+    logger.info("")
 
 def test_health_endpoint():
     """Test the health endpoint"""
-    print("=== Testing Health Endpoint ===")
+    logger.info("=== Testing Health Endpoint ===")
     
-    response = requests.get(f"{BASE_URL}/health")
-    print(f"GET {BASE_URL}/health")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    response = SESSION.get(_URL_HEALTH)
+    logger.info(f"GET {_URL_HEALTH}")
+    logger.info(f"Status: {response.status_code}")
+    logger.info(f"Response: {_dumps(_loads(response.content))}")
+    logger.info("")
 
 def test_cos_signature_verification():
     """Test COS signature verification (if secret is configured)"""
-    print("=== Testing COS Signature Verification ===")
+    logger.info("=== Testing COS Signature Verification ===")
     
     # This test would require a valid signature
     # For now, we'll just test the endpoint without signature
-    sample_event = {
-        "events": [
-            {
-                "eventType": "Object:Delete",
-                "bucket": "test-bucket",
-                "key": "uploads/deleted-file.txt",
-                "time": "2024-01-15T10:35:00.000Z"
-            }
-        ]
-    }
-    
     # Test without signature header (should work if no secret configured)
-    response = requests.post(f"{BASE_URL}/cos/events", json=sample_event)
-    print(f"POST {BASE_URL}/cos/events (no signature)")
-    print(f"Status: {response.status_code}")
-    print(f"Response: {json.dumps(response.json(), indent=2)}")
-    print()
+    response = SESSION.post(_URL_COS_EVENTS, data=_SAMPLE_DELETE_EVENT, headers=_JSON_HDR)
+    logger.info(f"POST {_URL_COS_EVENTS} (no signature)")
+    logger.info(f"Status: {response.status_code}")
+    logger.info(f"Response: {_dumps(_loads(response.content))}")
+    logger.info("")
 
 if __name__ == "__main__":
     try:
-        test_home_endpoint()
-        test_cos_events_endpoint()
-        test_data_endpoint()
-        test_health_endpoint()
-        test_cos_signature_verification()
-        print("All tests completed successfully!")
-        print("\nTo test with real COS events:")
-        print("1. Configure COS event notifications")
-        print("2. Upload files to your COS bucket")
-        print("3. Check application logs for events")
+        # The five drivers hit independent endpoints and are I/O-bound,
+        # so run them concurrently; the shared Session pool handles the
+        # parallel connections
+        tests = [
+            test_home_endpoint,
+            test_cos_events_endpoint,
+            test_data_endpoint,
+            test_health_endpoint,
+            test_cos_signature_verification,
+        ]
+        with ThreadPoolExecutor(max_workers=len(tests)) as pool:
+            list(pool.map(lambda test: test(), tests))
+        logger.info("All tests completed successfully!")
+        logger.info("\nTo test with real COS events:")
+        logger.info("1. Configure COS event notifications")
+        logger.info("2. Upload files to your COS bucket")
+        logger.info("3. Check application logs for events")
     except requests.exceptions.ConnectionError:
-        print("Error: Could not connect to the server.")
-        print("Make sure the Flask application is running on http://localhost:5000")
-        print("Run: python app.py")
+        logger.error("Error: Could not connect to the server.")
+        logger.error("Make sure the Flask application is running on http://localhost:5000")
+        logger.error("Run: python app.py")
     except Exception as e:
-        print(f"Error during testing: {e}") 
\ No newline at end of file
+        logger.error(f"Error during testing: {e}") 
\ No newline at end of file
@@ -3,9 +3,22 @@
 Test script to verify PDF detection logic with nested notification structure
 """
 
+import io
 import json
+import logging
+import sys
 from datetime import datetime
 
+# Per-event traces go through the logger with lazy %-formatting: at the
+# default INFO level the format work never happens. Raise to DEBUG to
+# see the step-by-step detection trace
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
 # Simulate the new nested notification structure from the logs
 nested_notification_event = {
     "bucket": "bucket-redact-test",
@@ -28,81 +41,101 @@ nested_notification_event = {
 def is_pdf_file(object_key):
     """Check if the uploaded file is a PDF"""
     if not object_key:
-        print(f"🔍 PDF Check: Object key is empty or None")
+        logger.debug("🔍 PDF Check: Object key is empty or None")
         return False
-    
-    # Check file extension
-    import os
-    file_extension = os.path.splitext(object_key.lower())[1]
-    print(f"🔍 PDF Check: File '{object_key}' has extension '{file_extension}'")
-    
-    if file_extension == '.pdf':
-        print(f"✅ PDF Detected: File '{object_key}' has .pdf extension")
+
+    # Lowercase once, then suffix/substring checks - no os.path calls
+    # or tuple allocations per event (mirrors app.py)
+    key_lower = object_key.lower()
+    if key_lower.endswith('.pdf'):
+        logger.debug("✅ PDF Detected: File %r has .pdf extension", object_key)
         return True
-    
+
     # Additional check: if the object key contains 'pdf' in the filename
-    filename = os.path.basename(object_key.lower())
+    filename = key_lower.rpartition('/')[2]
     if 'pdf' in filename:
-        print(f"✅ PDF Detected: File '{object_key}' contains 'pdf' in filename")
+        logger.debug("✅ PDF Detected: File %r contains 'pdf' in filename", object_key)
         return True
-    
-    print(f"❌ Not PDF: File '{object_key}' does not match PDF criteria")
-    print(f"🔍 File extension: '{file_extension}', filename: '{filename}'")
+
+    logger.debug("❌ Not PDF: File %r does not match PDF criteria", object_key)
     return False
 
+# Hoisted so membership is an O(1) hash probe instead of rebuilding an
+# 11-element list and scanning it per event (mirrors app.py)
+_UPLOAD_EVENTS = frozenset({
+    'Object:Put',
+    'Object:Post',
+    'Object:Write',
+    's3:ObjectCreated:Put',
+    's3:ObjectCreated:Post',
+    's3:ObjectCreated:CompleteMultipartUpload',
+    'Put',
+    'Post',
+    'Create',
+    'Upload',
+    'Write'
+})
+
 def is_upload_event(event_type):
     """Check if the event is an upload event"""
-    upload_events = [
-        'Object:Put',
-        'Object:Post',
-        'Object:Write',
-        's3:ObjectCreated:Put',
-        's3:ObjectCreated:Post',
-        's3:ObjectCreated:CompleteMultipartUpload',
-        'Put',
-        'Post',
-        'Create',
-        'Upload',
-        'Write'
-    ]
-    
-    is_upload = event_type in upload_events
-    print(f"🔍 Upload Event Check: '{event_type}' -> {'✅ Upload Event' if is_upload else '❌ Not Upload Event'}")
-    print(f"🔍 Available upload events: {upload_events}")
+    is_upload = event_type in _UPLOAD_EVENTS
+    logger.debug("🔍 Upload Event Check: %r -> %s", event_type,
+                 '✅ Upload Event' if is_upload else '❌ Not Upload Event')
     return is_upload
 
+def _extract_nested(event_data):
+    """Extract fields from an event carrying a nested notification dict"""
+    notification_data = event_data['notification']
+    if not isinstance(notification_data, dict):
+        return _extract_flat(event_data)
+
+    logger.debug("📋 Detected nested notification structure")
+    bucket = notification_data.get('bucket_name', event_data.get('bucket', 'Unknown'))
+    object_key = notification_data.get('object_name', event_data.get('key', 'Unknown'))
+    event_type = notification_data.get('event_type', event_data.get('operation', 'Unknown'))
+
+    logger.debug("📋 Nested notification extracted: bucket=%s, object_key=%s, event_type=%s", bucket, object_key, event_type)
+    return event_type, bucket, object_key
+
+def _extract_flat(event_data):
+    """Extract fields from a flat direct COS event"""
+    # Handle different possible field names for bucket and object key
+    bucket = event_data.get('bucket', event_data.get('bucket_name', 'Unknown'))
+    object_key = event_data.get('key', event_data.get('object_name', 'Unknown'))
+    notification = event_data.get('notification', 'Unknown')
+    operation = event_data.get('operation', 'Unknown')
+
+    # Handle different possible field names for event type
+    event_type = event_data.get('event_type', notification if notification != 'Unknown' else operation)
+
+    logger.debug("📋 Direct COS Event extracted: bucket=%s, object_key=%s, event_type=%s", bucket, object_key, event_type)
+    return event_type, bucket, object_key
+
+def _extract_generic(event_data):
+    """Fallback for key combinations not in the dispatch table"""
+    if isinstance(event_data.get('notification'), dict):
+        return _extract_nested(event_data)
+    return _extract_flat(event_data)
+
+# Known top-level key combinations dispatch straight to their extractor:
+# one frozenset hash + dict probe per event instead of re-walking the
+# branch cascade. _extract_nested still guards on the notification value
+# type, so a flat event with the same keys routes correctly
+_EXTRACTORS = {
+    frozenset(('bucket', 'endpoint', 'key', 'notification', 'operation')): _extract_nested,
+    frozenset(('bucket', 'key', 'notification', 'operation')): _extract_nested,
+    frozenset(('bucket_name', 'object_name', 'event_type')): _extract_flat,
+}
+
 def extract_direct_cos_event_info(event_data):
     """Extract event information from direct COS notification format"""
-    print(f"🔄 Extracting direct COS event info")
-    print(f"🔍 Raw event data: {event_data}")
-    
+    logger.debug("🔄 Extracting direct COS event info")
+    logger.debug("🔍 Raw event data: %s", event_data)
+
     try:
-        # Check if we have a nested notification structure
-        if 'notification' in event_data and isinstance(event_data['notification'], dict):
-            print("📋 Detected nested notification structure")
-            notification_data = event_data['notification']
-            
-            # Extract from notification object
-            bucket = notification_data.get('bucket_name', event_data.get('bucket', 'Unknown'))
-            object_key = notification_data.get('object_name', event_data.get('key', 'Unknown'))
-            event_type = notification_data.get('event_type', event_data.get('operation', 'Unknown'))
-            
-            print(f"📋 Nested notification extracted: bucket={bucket}, object_key={object_key}, event_type={event_type}")
-            
-        else:
-            # Handle different possible field names for bucket
-            bucket = event_data.get('bucket', event_data.get('bucket_name', 'Unknown'))
-            
-            # Handle different possible field names for object key
-            object_key = event_data.get('key', event_data.get('object_name', 'Unknown'))
-            notification = event_data.get('notification', 'Unknown')
-            operation = event_data.get('operation', 'Unknown')
-            
-            # Handle different possible field names for event type
-            event_type = event_data.get('event_type', notification if notification != 'Unknown' else operation)
-            
-            print(f"📋 Direct COS Event extracted: bucket={bucket}, object_key={object_key}, event_type={event_type}")
-        
+        extractor = _EXTRACTORS.get(frozenset(event_data), _extract_generic)
+        event_type, bucket, object_key = extractor(event_data)
+
         extracted_event = {
             'event_type': event_type,
             'bucket': bucket,
@@ -110,50 +143,62 @@ def extract_direct_cos_event_info(event_data):
             'timestamp': datetime.now().isoformat(),
             'source': 'direct_cos'
         }
-        
-        print(f"📋 Extracted event object: {extracted_event}")
+
+        logger.debug("📋 Extracted event object: %s", extracted_event)
         return extracted_event
-        
+
     except Exception as e:
-        print(f"❌ Error extracting direct COS event info: {e}")
+        logger.error("❌ Error extracting direct COS event info: %s", e)
         return None
 
 def check_pdf_upload(event):
     """Check if the event is a PDF upload and log it"""
-    print("🔍 Starting PDF upload check...")
+    logger.debug("🔍 Starting PDF upload check...")
     
     try:
         event_type = event.get('event_type', '')
         object_key = event.get('object_key', '')
         bucket = event.get('bucket', '')
         
-        print(f"🔍 PDF Upload Check: Event '{event_type}' for file '{object_key}' in bucket '{bucket}'")
-        print(f"🔍 Full event data: {event}")
+        logger.debug("🔍 PDF Upload Check: Event %r for file %r in bucket %r", event_type, object_key, bucket)
+        logger.debug("🔍 Full event data: %s", event)
         
         # Check if it's an upload event and the file is a PDF
         is_upload = is_upload_event(event_type)
         is_pdf = is_pdf_file(object_key)
         
-        print(f"🔍 Upload check result: {is_upload}")
-        print(f"🔍 PDF check result: {is_pdf}")
+        logger.debug("🔍 Upload check result: %s", is_upload)
+        logger.debug("🔍 PDF check result: %s", is_pdf)
         
         if is_upload and is_pdf:
-            print(f"📄 PDF UPLOAD DETECTED: File '{object_key}' uploaded to bucket '{bucket}' at {event.get('timestamp', 'unknown time')}")
-            print(f"📄 PDF Details: Event Type: {event_type}, Source: {event.get('source', 'unknown')}")
+            logger.debug("📄 PDF UPLOAD DETECTED: File %r uploaded to bucket %r at %s", object_key, bucket, event.get('timestamp', 'unknown time'))
+            logger.debug("📄 PDF Details: Event Type: %s, Source: %s", event_type, event.get('source', 'unknown'))
             return True
         else:
             if not is_upload:
-                print(f"📝 Not an upload event: {event_type}")
+                logger.debug("📝 Not an upload event: %s", event_type)
             if not is_pdf:
-                print(f"📝 Not a PDF file: {object_key}")
+                logger.debug("📝 Not a PDF file: %s", object_key)
             return False
             
     except Exception as e:
-        print(f"❌ Error checking PDF upload: {e}")
+        logger.error("❌ Error checking PDF upload: %s", e)
         return False
 
 def main():
     """Main test function"""
+    # Collect the report in memory and flush it with a single write():
+    # one syscall for the whole run instead of one per print
+    buf = io.StringIO()
+    old_stdout, sys.stdout = sys.stdout, buf
+    try:
+        _run_tests()
+    finally:
+        sys.stdout = old_stdout
+        old_stdout.write(buf.getvalue())
+
+def _run_tests():
+    """Run the nested-notification detection checks"""
     print("🧪 Testing PDF Detection Logic with Nested Notification Structure")
     print("=" * 70)
     
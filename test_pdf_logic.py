@@ -4,8 +4,13 @@ Test script to verify PDF detection logic with real COS event format
 """
 
 import json
+import logging
 from datetime import datetime
 
+# Per-event traces go through the logger with lazy %-formatting, so
+# importing callers that run many events pay nothing unless DEBUG is on
+logger = logging.getLogger(__name__)
+
 # Simulate the real COS event format from the logs
 real_cos_event = {
     "bucket_name": "bucket-redact-test",
@@ -22,53 +27,52 @@ real_cos_event = {
 def is_pdf_file(object_key):
     """Check if the uploaded file is a PDF"""
     if not object_key:
-        print(f"🔍 PDF Check: Object key is empty or None")
+        logger.debug("🔍 PDF Check: Object key is empty or None")
         return False
-    
-    # Check file extension
-    import os
-    file_extension = os.path.splitext(object_key.lower())[1]
-    print(f"🔍 PDF Check: File '{object_key}' has extension '{file_extension}'")
-    
-    if file_extension == '.pdf':
-        print(f"✅ PDF Detected: File '{object_key}' has .pdf extension")
+
+    # Lowercase once, then suffix/substring checks - no os.path calls
+    # or tuple allocations per event (mirrors app.py)
+    key_lower = object_key.lower()
+    if key_lower.endswith('.pdf'):
+        logger.debug("✅ PDF Detected: File %r has .pdf extension", object_key)
         return True
-    
+
     # Additional check: if the object key contains 'pdf' in the filename
-    filename = os.path.basename(object_key.lower())
+    filename = key_lower.rpartition('/')[2]
     if 'pdf' in filename:
-        print(f"✅ PDF Detected: File '{object_key}' contains 'pdf' in filename")
+        logger.debug("✅ PDF Detected: File %r contains 'pdf' in filename", object_key)
         return True
-    
-    print(f"❌ Not PDF: File '{object_key}' does not match PDF criteria")
-    print(f"🔍 File extension: '{file_extension}', filename: '{filename}'")
+
+    logger.debug("❌ Not PDF: File %r does not match PDF criteria", object_key)
     return False
 
+# Hoisted so membership is an O(1) hash probe instead of rebuilding an
+# 11-element list and scanning it per event (mirrors app.py)
+_UPLOAD_EVENTS = frozenset({
+    'Object:Put',
+    'Object:Post',
+    'Object:Write',
+    's3:ObjectCreated:Put',
+    's3:ObjectCreated:Post',
+    's3:ObjectCreated:CompleteMultipartUpload',
+    'Put',
+    'Post',
+    'Create',
+    'Upload',
+    'Write'
+})
+
 def is_upload_event(event_type):
     """Check if the event is an upload event"""
-    upload_events = [
-        'Object:Put',
-        'Object:Post',
-        'Object:Write',
-        's3:ObjectCreated:Put',
-        's3:ObjectCreated:Post',
-        's3:ObjectCreated:CompleteMultipartUpload',
-        'Put',
-        'Post',
-        'Create',
-        'Upload',
-        'Write'
-    ]
-    
-    is_upload = event_type in upload_events
-    print(f"🔍 Upload Event Check: '{event_type}' -> {'✅ Upload Event' if is_upload else '❌ Not Upload Event'}")
-    print(f"🔍 Available upload events: {upload_events}")
+    is_upload = event_type in _UPLOAD_EVENTS
+    logger.debug("🔍 Upload Event Check: %r -> %s", event_type,
+                 '✅ Upload Event' if is_upload else '❌ Not Upload Event')
     return is_upload
 
 def extract_direct_cos_event_info(event_data):
     """Extract event information from direct COS notification format"""
-    print(f"🔄 Extracting direct COS event info")
-    print(f"🔍 Raw event data: {event_data}")
+    logger.debug("🔄 Extracting direct COS event info")
+    logger.debug("🔍 Raw event data: %s", event_data)
     
     try:
         # Handle different possible field names for bucket
@@ -82,7 +86,7 @@ def extract_direct_cos_event_info(event_data):
         # Handle different possible field names for event type
         event_type = event_data.get('event_type', notification if notification != 'Unknown' else operation)
         
-        print(f"📋 Direct COS Event extracted: bucket={bucket}, object_key={object_key}, event_type={event_type}")
+        logger.debug("📋 Direct COS Event extracted: bucket=%s, object_key=%s, event_type=%s", bucket, object_key, event_type)
         
         extracted_event = {
             'event_type': event_type,
@@ -92,45 +96,64 @@ def extract_direct_cos_event_info(event_data):
             'source': 'direct_cos'
         }
         
-        print(f"📋 Extracted event object: {extracted_event}")
+        logger.debug("📋 Extracted event object: %s", extracted_event)
         return extracted_event
         
     except Exception as e:
-        print(f"❌ Error extracting direct COS event info: {e}")
+        logger.error("❌ Error extracting direct COS event info: %s", e)
         return None
 
+# Format detection as a first-match table instead of an if/elif chain,
+# so classifying a payload is one loop over predicates and the labels
+# live in one place
+_FORMAT_MATCHERS = (
+    ("S3-compatible format", lambda e: 'Records' in e),
+    ("IBM COS format", lambda e: 'events' in e),
+    ("direct COS notification format",
+     lambda e: 'bucket' in e and ('key' in e or 'object_name' in e)),
+    ("direct COS notification format (bucket_name/object_name)",
+     lambda e: 'bucket_name' in e and 'object_name' in e),
+)
+
+def detect_format(event_data):
+    """Classify which processing branch an event payload would take"""
+    for label, matches in _FORMAT_MATCHERS:
+        if matches(event_data):
+            return label
+    return "single event or unknown format"
+
 def check_pdf_upload(event):
     """Check if the event is a PDF upload and log it"""
-    print("🔍 Starting PDF upload check...")
+    logger.debug("🔍 Starting PDF upload check...")
     
     try:
         event_type = event.get('event_type', '')
         object_key = event.get('object_key', '')
         bucket = event.get('bucket', '')
         
-        print(f"🔍 PDF Upload Check: Event '{event_type}' for file '{object_key}' in bucket '{bucket}'")
-        print(f"🔍 Full event data: {event}")
+        logger.debug("🔍 PDF Upload Check: Event %r for file %r in bucket %r", event_type, object_key, bucket)
+        logger.debug("🔍 Full event data: %s", event)
         
         # Check if it's an upload event and the file is a PDF
         is_upload = is_upload_event(event_type)
         is_pdf = is_pdf_file(object_key)
         
-        print(f"🔍 Upload check result: {is_upload}")
-        print(f"🔍 PDF check result: {is_pdf}")
+        logger.debug("🔍 Upload check result: %s", is_upload)
+        logger.debug("🔍 PDF check result: %s", is_pdf)
         
         if is_upload and is_pdf:
-            print(f"📄 PDF UPLOAD DETECTED: File '{object_key}' uploaded to bucket '{bucket}' at {event.get('timestamp', 'unknown time')}")
-            print(f"📄 PDF Details: Event Type: {event_type}, Source: {event.get('source', 'unknown')}")
+            logger.debug("📄 PDF UPLOAD DETECTED: File %r uploaded to bucket %r at %s", object_key, bucket, event.get('timestamp', 'unknown time'))
+            logger.debug("📄 PDF Details: Event Type: %s, Source: %s", event_type, event.get('source', 'unknown'))
             return True
         else:
             if not is_upload:
-                print(f"📝 Not an upload event: {event_type}")
+                logger.debug("📝 Not an upload event: %s", event_type)
             if not is_pdf:
-                print(f"📝 Not a PDF file: {object_key}")
+                logger.debug("📝 Not a PDF file: %s", object_key)
             return False
             
     except Exception as e:
-        print(f"❌ Error checking PDF upload: {e}")
+        logger.error("❌ Error checking PDF upload: %s", e)
         return False
 
 def main():
@@ -143,16 +166,7 @@ def main():
     print(f"🔍 Event keys: {list(real_cos_event.keys())}")
     
     # Check which condition would be matched
-    if 'Records' in real_cos_event:
-        print("📋 Would process as S3-compatible format")
-    elif 'events' in real_cos_event:
-        print("📋 Would process as IBM COS format")
-    elif 'bucket' in real_cos_event and ('key' in real_cos_event or 'object_name' in real_cos_event):
-        print("📋 Would process as direct COS notification format")
-    elif 'bucket_name' in real_cos_event and 'object_name' in real_cos_event:
-        print("📋 Would process as direct COS notification format (bucket_name/object_name)")
-    else:
-        print("📋 Would process as single event or unknown format")
+    print(f"📋 Would process as {detect_format(real_cos_event)}")
     
     # Extract event info
     print("\n🔄 Extracting event information...")
@@ -173,4 +187,11 @@ def main():
         print("❌ FAILED: Event extraction failed")
 
 if __name__ == "__main__":
+    # Interactive runs keep the step-by-step trace; importers get a
+    # silent logger unless they configure one
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format='%(asctime)s - %(levelname)s - %(message)s',
+        datefmt='%H:%M:%S'
+    )
     main() 
\ No newline at end of file
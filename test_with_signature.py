@@ -4,19 +4,56 @@ Test COS Events with Proper Signature Verification
 This script sends test events with proper signatures for testing
 """
 
+import atexit
 import requests
+from requests.adapters import HTTPAdapter, Retry
 import json
 import os
 import hmac
 import hashlib
 import base64
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Configuration
 APP_URL = os.environ.get('APP_URL', 'http://localhost:5000')
 COS_SECRET_KEY = os.environ.get('COS_SECRET_KEY', 'test-secret-key')
 
-def generate_signature(payload, secret_key):
+# orjson parses/serializes JSON several times faster than stdlib json;
+# fall back gracefully when it is not installed
+try:
+    import orjson
+    _dumpb = orjson.dumps
+except ImportError:
+    def _dumpb(obj):
+        return json.dumps(obj).encode()
+
+# One keep-alive connection for the whole run instead of a TCP
+# handshake per request
+# Retry transient connection failures and gateway errors with a short
+# backoff so one flaky connect does not fail the whole run
+_RETRY = Retry(total=3, backoff_factor=0.2, status_forcelist=[502, 503, 504],
+               allowed_methods=frozenset(['GET', 'POST']))
+SESSION = requests.Session()
+# Pool sized to the fan-out concurrency; pool_block keeps a burst of
+# workers waiting for a pooled connection instead of opening and
+# discarding extras
+SESSION.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=8,
+                                     pool_block=True, max_retries=_RETRY))
+atexit.register(SESSION.close)
+
+# Bound every call so a slow or dead server fails the run fast instead
+# of hanging on the OS TCP timeout
+HTTP_TIMEOUT = (2.0, 10.0)  # (connect, read)
+
+# Key bytes are encoded once at import instead of on every signature.
+# COS_SIG_ALGO=blake2b switches to a keyed BLAKE2b digest for
+# benchmarking client-side signing cost (the server only verifies
+# HMAC-SHA256, so expect 401s in that mode)
+_KEY_BYTES = COS_SECRET_KEY.encode('utf-8')
+_SIG_ALGO = os.environ.get('COS_SIG_ALGO', 'sha256')
+
+def generate_signature(payload, secret_key=COS_SECRET_KEY):
     """
     Generate HMAC signature for the payload
     """
@@ -25,83 +62,109 @@ def generate_signature(payload, secret_key):
         payload_bytes = payload.encode('utf-8')
     else:
         payload_bytes = payload
-    
-    # Generate HMAC signature
-    signature = hmac.new(
-        secret_key.encode('utf-8'),
-        payload_bytes,
-        hashlib.sha256
-    ).digest()
-    
+
+    if secret_key is COS_SECRET_KEY:
+        key_bytes = _KEY_BYTES
+    else:
+        key_bytes = secret_key.encode('utf-8')
+
+    if _SIG_ALGO == 'blake2b':
+        digest = hashlib.blake2b(payload_bytes, key=key_bytes,
+                                 digest_size=32).digest()
+    else:
+        # hmac.digest is the one-shot fast path: no HMAC wrapper object,
+        # OpenSSL computes the whole digest in a single C call
+        digest = hmac.digest(key_bytes, payload_bytes, 'sha256')
+
     # Encode as base64
-    return base64.b64encode(signature).decode('utf-8')
+    return base64.b64encode(digest).decode('ascii')
+
+def sign_event(event_data, secret_key):
+    """
+    Serialize and sign an event once, returning (payload, signature)
 
-def send_test_event_with_signature(event_data, secret_key):
+    The payload is orjson-encoded bytes signed directly - one
+    serialization pass for both the signature and the request body.
+    Precomputing the pairs keeps JSON serialization and the HMAC out of
+    the send path, so measured request latency reflects the server.
     """
-    Send a test event with proper signature
+    payload = _dumpb(event_data)
+    return payload, generate_signature(payload, secret_key)
+
+def _post_signed(payload, signature):
+    """
+    POST a pre-signed payload; returns the response, or the exception
+    on a request failure
     """
-    # Convert event data to JSON string
-    payload = json.dumps(event_data)
-    
-    # Generate signature
-    signature = generate_signature(payload, secret_key)
-    
-    # Prepare headers
     headers = {
         'Content-Type': 'application/json',
         'X-Cos-Signature': signature
     }
-    
-    print(f"📤 Sending event with signature: {signature[:20]}...")
-    print(f"📦 Payload: {payload}")
-    print(f"🔑 Secret Key: {secret_key[:10]}..." if len(secret_key) > 10 else f"🔑 Secret Key: {secret_key}")
-    
     try:
-        response = requests.post(
+        return SESSION.post(
             f"{APP_URL}/cos/events",
             data=payload,
             headers=headers,
-            timeout=10
+            timeout=HTTP_TIMEOUT
         )
-        
-        print(f"📥 Response Status: {response.status_code}")
-        print(f"📥 Response: {response.text}")
-        
-        if response.status_code == 200:
-            data = response.json()
-            print(f"✅ Event processed successfully!")
-            print(f"✅ Message: {data['message']}")
-            for event in data.get('events', []):
-                print(f"   - {event['event_type']}: {event['object_key']}")
-        else:
-            print(f"❌ Event processing failed")
-            
-        return response.status_code == 200
-        
     except requests.exceptions.RequestException as e:
-        print(f"❌ Request failed: {e}")
+        return e
+
+def _report_signed_result(payload, signature, response, secret_key):
+    """Print the outcome of a signed send and return success"""
+    print(f"📤 Sent event with signature: {signature[:20]}...")
+    print(f"📦 Payload: {payload.decode('utf-8')}")
+    print(f"🔑 Secret Key: {secret_key[:10]}..." if len(secret_key) > 10 else f"🔑 Secret Key: {secret_key}")
+
+    if isinstance(response, Exception):
+        print(f"❌ Request failed: {response}")
         return False
 
+    print(f"📥 Response Status: {response.status_code}")
+    print(f"📥 Response: {response.text}")
+
+    if response.status_code == 200:
+        data = response.json()
+        print(f"✅ Event processed successfully!")
+        print(f"✅ Message: {data['message']}")
+        for event in data.get('events', []):
+            print(f"   - {event['event_type']}: {event['object_key']}")
+    else:
+        print(f"❌ Event processing failed")
+
+    return response.status_code == 200
+
+def send_test_event_with_signature(payload, signature, secret_key):
+    """
+    Send a pre-signed test event (a payload/signature pair from
+    sign_event)
+    """
+    response = _post_signed(payload, signature)
+    return _report_signed_result(payload, signature, response, secret_key)
+
 def test_with_signature():
     """Test events with proper signature verification"""
     print("🔐 Testing COS Events with Signature Verification")
     print("=" * 60)
-    
+
+    # One timestamp pass for the whole run instead of a syscall and
+    # format per event
+    now = datetime.now()
+    now_iso = now.isoformat()
+    now_tag = now.strftime('%Y%m%d-%H%M%S')
+
     # Test event 1: Object Put
     test_event_1 = {
         "events": [
             {
                 "eventType": "Object:Put",
                 "bucket": "test-bucket",
-                "key": f"uploads/test-file-{datetime.now().strftime('%Y%m%d-%H%M%S')}.txt",
-                "time": datetime.now().isoformat()
+                "key": f"uploads/test-file-{now_tag}.txt",
+                "time": now_iso
             }
         ]
     }
     
-    print("\n1️⃣ Testing Object:Put event:")
-    success_1 = send_test_event_with_signature(test_event_1, COS_SECRET_KEY)
-    
     # Test event 2: Object Delete
     test_event_2 = {
         "events": [
@@ -109,20 +172,17 @@ def test_with_signature():
                 "eventType": "Object:Delete",
                 "bucket": "test-bucket",
                 "key": "uploads/deleted-file.txt",
-                "time": datetime.now().isoformat()
+                "time": now_iso
             }
         ]
     }
     
-    print("\n2️⃣ Testing Object:Delete event:")
-    success_2 = send_test_event_with_signature(test_event_2, COS_SECRET_KEY)
-    
     # Test event 3: S3 compatible format
     test_event_3 = {
         "Records": [
             {
                 "eventName": "ObjectCreated:Put",
-                "eventTime": datetime.now().isoformat(),
+                "eventTime": now_iso,
                 "s3": {
                     "bucket": {
                         "name": "test-bucket"
@@ -135,9 +195,26 @@ def test_with_signature():
         ]
     }
     
-    print("\n3️⃣ Testing S3-compatible format:")
-    success_3 = send_test_event_with_signature(test_event_3, COS_SECRET_KEY)
-    
+    # The three signed events are independent, so sign them up front
+    # and send them concurrently over the pooled session - one round
+    # trip of latency instead of three - then report in order
+    labels = (
+        "1️⃣ Testing Object:Put event:",
+        "2️⃣ Testing Object:Delete event:",
+        "3️⃣ Testing S3-compatible format:",
+    )
+    signed = [sign_event(event, COS_SECRET_KEY)
+              for event in (test_event_1, test_event_2, test_event_3)]
+    with ThreadPoolExecutor(max_workers=len(signed)) as pool:
+        responses = list(pool.map(lambda pair: _post_signed(*pair), signed))
+
+    results = []
+    for label, (payload, signature), response in zip(labels, signed, responses):
+        print(f"\n{label}")
+        results.append(_report_signed_result(payload, signature, response,
+                                             COS_SECRET_KEY))
+    success_1, success_2, success_3 = results
+
     # Summary
     print("\n" + "=" * 60)
     print("📊 Test Results Summary:")
@@ -167,11 +244,11 @@ def test_without_signature():
     }
     
     try:
-        response = requests.post(
+        response = SESSION.post(
             f"{APP_URL}/cos/events",
-            json=test_event,
+            data=_dumpb(test_event),
             headers={'Content-Type': 'application/json'},
-            timeout=10
+            timeout=HTTP_TIMEOUT
         )
         
         print(f"📥 Response Status: {response.status_code}")